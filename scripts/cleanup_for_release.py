@@ -25,6 +25,11 @@ def cleanup_databases():
             print(f"  ✅ {db_file.name} deleted from user data directory")
         else:
             print(f"  ℹ️ No {db_file.name} found in user data directory")
+        # WAL mode leaves -wal/-shm side files next to each database
+        for suffix in ("-wal", "-shm"):
+            side_file = db_file.with_name(db_file.name + suffix)
+            if side_file.exists():
+                side_file.unlink()
 
     # Also clean up old root directory databases
     if os.path.exists('app.db'):
@@ -163,33 +168,28 @@ def create_sample_data():
             conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             
+            # One multi-row insert for both members (RETURNING needs SQLite 3.35+);
+            # row order from RETURNING isn't guaranteed, so map ids back by name
             cursor.execute("""
                 INSERT INTO members (name, pronouns, color, avatar_path, description)
-                VALUES (?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?), (?, ?, ?, ?, ?)
+                RETURNING id, name
             """, (
                 "Member A", "they/them", "#7745d1", "default_avatar.png",
-                "This is a sample member for demonstration. You can edit or delete this member and add your own!"
-            ))
-            member_a_id = cursor.lastrowid
-            
-            cursor.execute("""
-                INSERT INTO members (name, pronouns, color, avatar_path, description)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
+                "This is a sample member for demonstration. You can edit or delete this member and add your own!",
                 "Member B", "she/her", "#ba1ca1", "default_avatar.png",
                 "Another sample member for demonstration. Feel free to customize or replace with your own members!"
             ))
-            member_b_id = cursor.lastrowid
+            member_ids = {name: member_id for member_id, name in cursor.fetchall()}
             
-            cursor.execute("""
+            timestamp = datetime.now().strftime("%H:%M")
+            cursor.executemany("""
                 INSERT INTO messages (member_id, message, timestamp)
                 VALUES (?, ?, ?)
-            """, (member_a_id, "Hi! Welcome to Plural Chat! This is a sample message from Member A.", datetime.now().strftime("%H:%M")))
-            
-            cursor.execute("""
-                INSERT INTO messages (member_id, message, timestamp) 
-                VALUES (?, ?, ?)
-            """, (member_b_id, "Hello there! I'm Member B. You can delete us and add your own system members through Settings > Members.", datetime.now().strftime("%H:%M")))
+            """, [
+                (member_ids["Member A"], "Hi! Welcome to Plural Chat! This is a sample message from Member A.", timestamp),
+                (member_ids["Member B"], "Hello there! I'm Member B. You can delete us and add your own system members through Settings > Members.", timestamp)
+            ])
             
             conn.commit()
             conn.close()
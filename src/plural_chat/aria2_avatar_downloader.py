@@ -5,6 +5,7 @@ Because downloading thousands of avatars one-by-one is for peasants 😂
 """
 
 import os
+import re
 import json
 import subprocess
 import tempfile
@@ -13,6 +14,22 @@ from pathlib import Path
 from PIL import Image
 import shutil
 import platformdirs
+from functools import lru_cache
+
+# Same pattern as pluralkit_api.UNSAFE_FILENAME_CHARS. Kept local because the
+# sync worker loads this module as a script, where package imports don't resolve
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\-_]')
+
+
+@lru_cache(maxsize=1)
+def _aria2_available():
+    """Probe for aria2c once per process - the binary won't appear mid-run"""
+    try:
+        result = subprocess.run(['aria2c', '--version'], 
+                              capture_output=True, text=True, timeout=5)
+        return result.returncode == 0
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return False
 
 
 class Aria2AvatarDownloader:
@@ -25,12 +42,7 @@ class Aria2AvatarDownloader:
         
     def check_aria2_available(self):
         """Check if aria2c is installed"""
-        try:
-            result = subprocess.run(['aria2c', '--version'], 
-                                  capture_output=True, text=True, timeout=5)
-            return result.returncode == 0
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            return False
+        return _aria2_available()
     
     def generate_download_list(self, members):
         """Generate aria2 input file with all avatar URLs that need downloading"""
@@ -67,8 +79,7 @@ class Aria2AvatarDownloader:
     
     def _sanitize_filename(self, member_id):
         """Sanitize filename to prevent path traversal"""
-        import re
-        safe_id = re.sub(r'[^\w\-_]', '_', str(member_id))
+        safe_id = _UNSAFE_FILENAME_CHARS.sub('_', str(member_id))
         return safe_id[:50] if safe_id else "unknown"
     
     def download_avatars_bulk(self, members, system_db):
@@ -119,19 +130,19 @@ class Aria2AvatarDownloader:
             ]
             
             self.logger.info(f"Launching aria2: {' '.join(aria2_cmd)}")
-            start_time = time.time()
+            start_time = time.monotonic()
             
             # Run aria2 and capture output
             process = subprocess.Popen(aria2_cmd, stdout=subprocess.PIPE, 
                                      stderr=subprocess.STDOUT, text=True)
             
             # Monitor progress with rate limiting
-            last_update_time = time.time()
+            last_update_time = time.monotonic()
             while process.poll() is None:
-                current_time = time.time()
+                current_time = time.monotonic()
                 if current_time - last_update_time >= 1.0:  # At least 1 second between updates
                     if self.status_callback:
-                        elapsed = time.time() - start_time
+                        elapsed = current_time - start_time
                         # Estimate progress based on time (aria2 is usually very fast)
                         progress = min(30 + (elapsed * 10), 80)  # Progress from 30-80%
                         self.status_callback("running", f"aria2 downloading... ({elapsed:.1f}s)", int(progress))
@@ -140,7 +151,7 @@ class Aria2AvatarDownloader:
             
             # Get final output
             stdout, _ = process.communicate()
-            download_time = time.time() - start_time
+            download_time = time.monotonic() - start_time
             
             if process.returncode == 0:
                 self.logger.info(f"✅ aria2 completed in {download_time:.2f} seconds!")
@@ -177,6 +188,7 @@ class Aria2AvatarDownloader:
     def _process_downloaded_files(self, download_list, members_to_update, system_db):
         """Convert downloaded files to WebP and update database"""
         success_count = 0
+        avatar_updates = []  # (member_id, path) pairs, written in one transaction
         
         for i, item in enumerate(download_list):
             try:
@@ -191,8 +203,8 @@ class Aria2AvatarDownloader:
                 # Convert to WebP
                 self._convert_to_webp(temp_path, final_path)
                 
-                # Update database
-                system_db.update_member(member['id'], avatar_path=str(final_path))
+                # Queue the database update
+                avatar_updates.append((member['id'], str(final_path)))
                 
                 # Clean up temp file
                 temp_path.unlink()
@@ -212,6 +224,7 @@ class Aria2AvatarDownloader:
                 except:
                     pass
         
+        system_db.update_member_avatars(avatar_updates)
         return success_count
     
     def _convert_to_webp(self, input_path, output_path):
@@ -3,9 +3,13 @@ Custom themes for Plural Chat
 Add your custom ttkbootstrap themes here
 """
 
+import logging
+
 import ttkbootstrap as ttk
 from ttkbootstrap import Style
 
+logger = logging.getLogger('plural_chat.custom_themes')
+
 # Custom themes dictionary - DISABLED cyberpunk_plural (causes errors)
 CUSTOM_THEMES = {
     # CYBERPUNK_PLURAL THEME DISABLED DUE TO StyleBuilderTTK ERRORS
@@ -53,23 +57,23 @@ def register_custom_themes():
             # Check if we can register it
             if hasattr(style, 'register_theme'):
                 style.register_theme(theme)
-                print(f"✅ Registered theme: {theme.name}")
+                logger.info(f"Registered theme: {theme.name}")
             else:
                 # Fallback - try to use the theme definition directly
                 if hasattr(style, 'theme_create'):
                     style.theme_create(theme.name, theme)
-                    print(f"✅ Created theme: {theme.name}")
+                    logger.info(f"Created theme: {theme.name}")
                 else:
-                    print(f"⚠️  Theme registration not available, using manual styling")
+                    logger.warning("Theme registration not available, using manual styling")
                     
         except ImportError as e:
-            print(f"⚠️  Could not import theme definition: {e}")
+            logger.warning(f"Could not import theme definition: {e}")
         except Exception as e:
-            print(f"⚠️  Theme registration failed: {e}")
-            print("   Theme will be available in settings but may use manual styling")
+            logger.warning(f"Theme registration failed: {e}; "
+                           "theme will be available in settings but may use manual styling")
                 
     except Exception as e:
-        print(f"❌ Error in theme registration: {e}")
+        logger.error(f"Error in theme registration: {e}")
         # Continue anyway - themes will still be in the list
 
 def get_custom_theme_names():
@@ -184,11 +188,11 @@ def apply_custom_theme(theme_name, style_obj):
                           foreground=colors['selectfg'],
                           bordercolor=colors['border'])
         
-        print(f"✅ Applied comprehensive custom theme: {theme_name}")
+        logger.info(f"Applied comprehensive custom theme: {theme_name}")
         return True
         
     except Exception as e:
-        print(f"❌ Error applying custom theme {theme_name}: {e}")
+        logger.error(f"Error applying custom theme {theme_name}: {e}")
         return False
 
 def get_theme_info(theme_name):
@@ -2,7 +2,6 @@ import sqlite3
 import json
 import base64
 import os
-import hashlib
 from pathlib import Path
 import platformdirs
 from datetime import datetime
@@ -12,6 +11,19 @@ import logging
 from logging.handlers import RotatingFileHandler
 
 
+def _connect(db_path):
+    """Open a connection to one of the app's databases"""
+    conn = sqlite3.connect(db_path)
+    # In WAL mode NORMAL only syncs at checkpoints instead of on every
+    # commit, and the database can't be corrupted by a crash either way
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class EncryptionKeyError(Exception):
+    """The token encryption key exists but can't be read or is invalid"""
+
+
 class AppDatabase:
     """Manages app-level settings and preferences"""
     
@@ -23,13 +35,19 @@ class AppDatabase:
         else:
             self.db_path = db_path
         self._encryption_key = None
+        self._fernet = None
+        self._key_error = None  # Set once the key file has failed to load
+        self._token_cache = {}  # service -> decrypted token
         self.init_database()
         self.logger = logging.getLogger('plural_chat.app_database')
     
     def init_database(self):
         """Initialize the app database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
+            # WAL lets the UI keep reading while the sync worker writes, and
+            # the mode is stored in the file so it only needs setting here
+            cursor.execute("PRAGMA journal_mode=WAL")
             
             # App settings table
             cursor.execute("""
@@ -65,6 +83,8 @@ class AppDatabase:
         """Get or create encryption key for secure token storage"""
         if self._encryption_key:
             return self._encryption_key
+        if self._key_error:
+            raise self._key_error
         
         # Use platformdirs for the key file as well
         key_dir = Path(platformdirs.user_data_dir("PluralChat", "DuskfallCrew"))
@@ -72,14 +92,18 @@ class AppDatabase:
         key_file = key_dir / ".app_key"
         
         if key_file.exists():
+            # Never regenerate an existing key: doing so would make every
+            # stored token undecryptable
             try:
                 with open(key_file, 'rb') as f:
-                    self._encryption_key = f.read()
-            except:
-                # Generate new key if file is corrupted
-                self._encryption_key = Fernet.generate_key()
-                with open(key_file, 'wb') as f:
-                    f.write(self._encryption_key)
+                    key = f.read()
+                Fernet(key)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Could not load encryption key from {key_file}: {e}")
+                self._key_error = EncryptionKeyError(
+                    f"Could not load the token encryption key from {key_file}: {e}")
+                raise self._key_error from e
+            self._encryption_key = key
         else:
             # Generate new key
             self._encryption_key = Fernet.generate_key()
@@ -90,21 +114,23 @@ class AppDatabase:
         
         return self._encryption_key
     
+    def _get_fernet(self) -> Fernet:
+        """Get the Fernet cipher for the app key (built once per instance)"""
+        if self._fernet is None:
+            self._fernet = Fernet(self._get_encryption_key())
+        return self._fernet
+    
     def _encrypt_token(self, token: str) -> str:
         """Encrypt token using AES encryption"""
-        try:
-            fernet = Fernet(self._get_encryption_key())
-            encrypted = fernet.encrypt(token.encode())
-            return base64.b64encode(encrypted).decode()
-        except Exception as e:
-            self.logger.warning(f"Encryption failed: {e}")
-            # Fallback to base64 (temporary)
-            return base64.b64encode(token.encode()).decode()
+        # Key problems raise EncryptionKeyError; never store the token unencrypted
+        fernet = self._get_fernet()
+        encrypted = fernet.encrypt(token.encode())
+        return base64.b64encode(encrypted).decode()
     
     def _decrypt_token(self, encrypted_token: str) -> str:
         """Decrypt token using AES encryption"""
+        fernet = self._get_fernet()  # Key problems raise EncryptionKeyError
         try:
-            fernet = Fernet(self._get_encryption_key())
             encrypted_bytes = base64.b64decode(encrypted_token.encode())
             decrypted = fernet.decrypt(encrypted_bytes)
             return decrypted.decode()
@@ -112,14 +138,20 @@ class AppDatabase:
             self.logger.warning(f"Decryption failed, trying base64 fallback: {e}")
             # Fallback for old base64-only tokens
             try:
-                return base64.b64decode(encrypted_token).decode()
+                decoded = base64.b64decode(encrypted_token).decode()
             except:
                 self.logger.warning(f"All decryption methods failed")
                 return ""
+            # A Fernet token (version byte 0x80 + timestamp, i.e. "gAAAAA...")
+            # was encrypted with another key; it is not a legacy plain token
+            if decoded.startswith("gAAAAA"):
+                self.logger.warning("Stored token was encrypted with a different key")
+                return ""
+            return decoded
     
     def get_setting(self, key: str, default=None):
         """Get an app setting"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT value FROM app_settings WHERE key = ?", (key,))
             result = cursor.fetchone()
@@ -127,7 +159,7 @@ class AppDatabase:
     
     def set_setting(self, key: str, value: str):
         """Set an app setting"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO app_settings (key, value, updated_at)
@@ -137,7 +169,7 @@ class AppDatabase:
     
     def get_all_settings(self) -> Dict[str, str]:
         """Get all app settings as a dictionary"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT key, value FROM app_settings")
             return dict(cursor.fetchall())
@@ -149,28 +181,36 @@ class AppDatabase:
             raise ValueError("Token cannot be empty")
         
         encrypted_token = self._encrypt_token(token)
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO api_tokens (service, token_data, created_at)
                 VALUES (?, ?, CURRENT_TIMESTAMP)
             """, (service, encrypted_token))
             conn.commit()
+            self._token_cache[service] = token
             self.logger.info(f"Securely stored {service} token")
     
     def get_api_token(self, service: str) -> Optional[str]:
         """Get an API token (properly decrypted)"""
-        with sqlite3.connect(self.db_path) as conn:
+        # Tokens only change through store_api_token, so decrypt each one once
+        if service in self._token_cache:
+            return self._token_cache[service]
+        
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT token_data FROM api_tokens WHERE service = ?", (service,))
             result = cursor.fetchone()
             if result:
-                return self._decrypt_token(result[0])
+                token = self._decrypt_token(result[0])
+                if token:  # Failed decrypts return "" and are retried next time
+                    self._token_cache[service] = token
+                return token
             return None
     
     def update_sync_time(self, service: str):
         """Update the last sync time for a service"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE api_tokens SET last_sync = CURRENT_TIMESTAMP 
@@ -194,8 +234,9 @@ class SystemDatabase:
     
     def init_database(self):
         """Initialize the system database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
             
             # System info table
             cursor.execute("""
@@ -254,10 +295,15 @@ class SystemDatabase:
                 cursor.execute("ALTER TABLE members ADD COLUMN proxy_tags TEXT")
             
             # Create indexes for performance
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_member_name ON members(name)")
+            # members.name is UNIQUE, so SQLite already maintains an index on it;
+            # a second one only costs space and slows member writes
+            cursor.execute("DROP INDEX IF EXISTS idx_member_name")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_message_member ON messages(member_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_message_timestamp ON messages(created_at)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_diary_member ON diary_entries(member_id)")
+            # Per-member diary listings filter on member_id and sort by newest
+            # first; one composite index serves both (and plain member_id lookups)
+            cursor.execute("DROP INDEX IF EXISTS idx_diary_member")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_diary_member_created ON diary_entries(member_id, created_at DESC)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_diary_created ON diary_entries(created_at)")
             
             conn.commit()
@@ -266,7 +312,7 @@ class SystemDatabase:
                    color: str = None, description: str = None, pk_id: str = None, 
                    proxy_tags: str = None) -> int:
         """Add a new member and return their ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO members (name, pronouns, avatar_path, color, description, pk_id, proxy_tags)
@@ -275,9 +321,33 @@ class SystemDatabase:
             conn.commit()
             return cursor.lastrowid
     
+    def add_members(self, members: List[Dict]) -> List[Tuple[Optional[int], Optional[str]]]:
+        """
+        Add many members in a single transaction
+        Returns one (member_id, error) pair per member; a failed insert (e.g. a
+        duplicate name) is reported as (None, error) without aborting the rest
+        """
+        results = []
+        with _connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            for member in members:
+                try:
+                    cursor.execute("""
+                        INSERT INTO members (name, pronouns, avatar_path, color, description, pk_id, proxy_tags)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, (member.get("name"), member.get("pronouns"), member.get("avatar_path"),
+                          member.get("color"), member.get("description"), member.get("pk_id"),
+                          member.get("proxy_tags")))
+                    results.append((cursor.lastrowid, None))
+                except sqlite3.Error as e:
+                    # Only the failed statement is rolled back; the transaction continues
+                    results.append((None, str(e)))
+            conn.commit()
+        return results
+    
     def get_member_by_name(self, name: str) -> Optional[Dict]:
         """Get a member by name"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM members WHERE name = ?", (name,))
@@ -286,7 +356,7 @@ class SystemDatabase:
     
     def get_member_by_id(self, member_id: int) -> Optional[Dict]:
         """Get a member by ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM members WHERE id = ?", (member_id,))
@@ -295,12 +365,20 @@ class SystemDatabase:
     
     def get_all_members(self) -> List[Dict]:
         """Get all members"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM members ORDER BY name")
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_member_keys(self) -> List[Dict]:
+        """Get just the identifying columns (id, name, pk_id) of every member"""
+        with _connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name, pk_id FROM members ORDER BY name")
+            return [dict(row) for row in cursor.fetchall()]
+    
     def update_member(self, member_id: int, **kwargs):
         """Update a member's information"""
         if not kwargs:
@@ -310,7 +388,7 @@ class SystemDatabase:
         values = list(kwargs.values())
         values.append(member_id)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute(f"""
                 UPDATE members SET {set_clause}, updated_at = CURRENT_TIMESTAMP
@@ -318,9 +396,22 @@ class SystemDatabase:
             """, values)
             conn.commit()
     
+    def update_member_avatars(self, avatar_paths: List[tuple]):
+        """Set avatar_path for many members in one transaction: [(member_id, avatar_path), ...]"""
+        if not avatar_paths:
+            return
+        
+        with _connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                UPDATE members SET avatar_path = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, [(avatar_path, member_id) for member_id, avatar_path in avatar_paths])
+            conn.commit()
+    
     def delete_member(self, member_id: int):
         """Delete a member and their messages"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM messages WHERE member_id = ?", (member_id,))
             cursor.execute("DELETE FROM members WHERE id = ?", (member_id,))
@@ -331,7 +422,7 @@ class SystemDatabase:
         if timestamp is None:
             timestamp = datetime.now().strftime("%H:%M")
         
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO messages (member_id, message, timestamp)
@@ -342,7 +433,7 @@ class SystemDatabase:
     
     def get_messages(self, limit: int = 100) -> List[Dict]:
         """Get recent messages with member information"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute("""
@@ -357,7 +448,7 @@ class SystemDatabase:
     
     def get_system_info(self, key: str, default=None):
         """Get system information"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT value FROM system_info WHERE key = ?", (key,))
             result = cursor.fetchone()
@@ -365,7 +456,7 @@ class SystemDatabase:
     
     def set_system_info(self, key: str, value: str):
         """Set system information"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO system_info (key, value, updated_at)
@@ -378,7 +469,7 @@ class SystemDatabase:
         members = self.get_all_members()
         messages = self.get_messages(limit=10000)  # Get all messages
         
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT key, value FROM system_info")
             system_info = dict(cursor.fetchall())
@@ -393,7 +484,7 @@ class SystemDatabase:
     
     def import_from_dict(self, data: Dict):
         """Import system data from a dictionary (from JSON import)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             
             # Clear existing data
@@ -410,6 +501,7 @@ class SystemDatabase:
             
             # Import members
             member_id_map = {}  # Map old IDs to new IDs
+            member_name_map = {}  # Map imported names to new IDs (legacy messages)
             if "members" in data:
                 for member in data["members"]:
                     # Handle duplicate names by adding suffix
@@ -432,6 +524,7 @@ class SystemDatabase:
                                 member.get("proxy_tags")
                             ))
                             new_id = cursor.lastrowid
+                            member_name_map[name] = new_id
                             if "id" in member:
                                 member_id_map[member["id"]] = new_id
                             break  # Success, exit the loop
@@ -446,33 +539,35 @@ class SystemDatabase:
             
             # Import messages
             if "messages" in data:
+                message_rows = []
                 for message in data["messages"]:
                     # Handle both old and new message formats
                     if "member_id" in message and message["member_id"] in member_id_map:
                         member_id = member_id_map[message["member_id"]]
                     else:
-                        # Find member by name (legacy support)
+                        # Find member by name (legacy support) - the members table
+                        # was just rebuilt from this data, so the map is complete
                         member_name = message.get("member_name") or message.get("member")
-                        cursor.execute("SELECT id FROM members WHERE name = ?", (member_name,))
-                        result = cursor.fetchone()
-                        if not result:
+                        member_id = member_name_map.get(member_name)
+                        if member_id is None:
                             continue
-                        member_id = result[0]
                     
-                    cursor.execute("""
-                        INSERT INTO messages (member_id, message, timestamp)
-                        VALUES (?, ?, ?)
-                    """, (
+                    message_rows.append((
                         member_id,
                         message.get("message", ""),
                         message.get("timestamp", "")
                     ))
+                
+                cursor.executemany("""
+                    INSERT INTO messages (member_id, message, timestamp)
+                    VALUES (?, ?, ?)
+                """, message_rows)
             
             conn.commit()
     
     def add_diary_entry(self, member_id: int, title: str, content: str) -> int:
         """Add a new diary entry and return its ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO diary_entries (member_id, title, content)
@@ -483,7 +578,7 @@ class SystemDatabase:
     
     def get_diary_entries(self, member_id: int = None, limit: int = None) -> List[Dict]:
         """Get diary entries, optionally filtered by member"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -514,7 +609,7 @@ class SystemDatabase:
     
     def get_diary_entry(self, entry_id: int) -> Optional[Dict]:
         """Get a specific diary entry"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute("""
@@ -545,7 +640,7 @@ class SystemDatabase:
         updates.append("updated_at = CURRENT_TIMESTAMP")
         params.append(entry_id)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute(f"""
                 UPDATE diary_entries SET {', '.join(updates)}
@@ -555,14 +650,14 @@ class SystemDatabase:
     
     def delete_diary_entry(self, entry_id: int):
         """Delete a diary entry"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM diary_entries WHERE id = ?", (entry_id,))
             conn.commit()
     
     def search_diary_entries(self, search_term: str, member_id: int = None) -> List[Dict]:
         """Search diary entries by content or title"""
-        with sqlite3.connect(self.db_path) as conn:
+        with _connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -19,19 +19,19 @@ class DiaryDialog:
     """Per-member diary dialog with modern UI"""
     
     def __init__(self, parent, system_db, members, app_db=None):
-        print("🔥 DiaryDialog __init__ started")
+        self.logger = logging.getLogger('plural_chat.diary')
+        self.logger.debug("DiaryDialog init started")
         self.parent = parent
         self.system_db = system_db
         self.members = members
         self.app_db = app_db
         self.current_entry_id = None
-        self.logger = logging.getLogger('plural_chat.diary')
         
-        print("🔥 Creating window...")
+        self.logger.debug("Creating diary window")
         self.create_window()
-        print("🔥 Setting up UI...")
+        self.logger.debug("Setting up diary UI")
         self.setup_ui()
-        print("🔥 DiaryDialog init complete")
+        self.logger.debug("DiaryDialog init complete")
         # Mark initialization as complete so callbacks can work
         self._initialization_complete = True
         # Now that initialization is done, load the initial entries
@@ -68,26 +68,22 @@ class DiaryDialog:
             # Right panel - Editor
             self.setup_editor(main_frame)
         except Exception as e:
-            self.logger.error(f"Error setting up diary UI: {e}")
-            print(f"DIARY UI ERROR: {e}")  # Force print to console
-            import traceback
-            traceback.print_exc()  # Show full error trace
+            self.logger.exception(f"Error setting up diary UI: {e}")
             # Create a simple error message in the window
             try:
                 error_label = ttk.Label(self.window, text=f"Error loading diary UI: {e}")
                 error_label.pack(pady=20)
             except Exception as e2:
-                print(f"Even error label failed: {e2}")
+                self.logger.error(f"Even error label failed: {e2}")
     
     def setup_entry_list(self, parent):
         """Setup the entry list on the left side"""
         try:
-            print("Setting up entry list...")
+            self.logger.debug("Setting up entry list")
             left_frame = ttk.LabelFrame(parent, text="📝 Diary Entries", padding=10)
             left_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 5))
             left_frame.grid_rowconfigure(2, weight=1)
             left_frame.grid_columnconfigure(0, weight=1)
-            print("Entry list frame created successfully")
             
             # Member selector
             member_frame = ttk.Frame(left_frame)
@@ -121,11 +117,8 @@ class DiaryDialog:
                       bootstyle="danger-outline", command=self.delete_entry).pack(side=LEFT, padx=(0, 5))
             ttk.Button(button_frame, text="📤 Export", 
                       bootstyle="info-outline", command=self.export_diary).pack(side=LEFT)
-            print("Entry list setup completed successfully")
         except Exception as e:
-            print(f"ERROR in setup_entry_list: {e}")
-            import traceback
-            traceback.print_exc()
+            self.logger.exception(f"Error in setup_entry_list: {e}")
     
     def setup_tableview(self, parent):
         """Setup a simple treeview for entries (replacing broken tableview)"""
@@ -171,7 +164,7 @@ class DiaryDialog:
     
     def setup_editor(self, parent):
         """Setup the editor on the right side"""
-        print("Setting up editor...")
+        self.logger.debug("Setting up editor")
         right_frame = ttk.LabelFrame(parent, text="✍️ Write Entry", padding=10)
         right_frame.grid(row=0, column=1, sticky="nsew", padx=(5, 0))
         right_frame.grid_rowconfigure(2, weight=1)
@@ -252,7 +245,6 @@ class DiaryDialog:
                   bootstyle="warning-outline", command=self.clear_editor).pack(side=LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="❌ Close", 
                   bootstyle="secondary-outline", command=self.close_dialog).pack(side=RIGHT)
-        print("Editor setup completed successfully")
     
     def load_entries(self):
         """Load diary entries into the list"""
@@ -272,21 +264,19 @@ class DiaryDialog:
                 else:
                     entries = []
             
-            print(f"Loaded {len(entries)} diary entries")
+            self.logger.debug(f"Loaded {len(entries)} diary entries")
             
             # Update UI directly - use simple listbox (tableview is broken)
             self.load_entries_listbox(entries)
                 
         except Exception as e:
             self.logger.error(f"Error loading diary entries: {e}")
-            print(f"Diary loading error: {e}")
             # Show empty list on error
             self.load_entries_listbox([])
     
     def load_entries_tableview(self, entries):
         """Load entries into the treeview"""
         try:
-            print(f"Loading {len(entries)} entries into treeview")
             
             # Clear existing entries
             for item in self.entry_table.get_children():
@@ -306,11 +296,9 @@ class DiaryDialog:
                 ))
             
             self.entries_data = entries  # Store for selection
-            print(f"Treeview updated successfully with {len(entries)} entries")
+            self.logger.debug(f"Treeview updated with {len(entries)} entries")
         except Exception as e:
-            print(f"Error in load_entries_tableview: {e}")
-            import traceback
-            traceback.print_exc()
+            self.logger.exception(f"Error in load_entries_tableview: {e}")
     
     def load_entries_listbox(self, entries):
         """Load entries into the fallback listbox"""
@@ -327,11 +315,11 @@ class DiaryDialog:
         """Handle member selection change"""
         # Don't load during initialization
         if hasattr(self, '_initialization_complete') and self._initialization_complete:
-            print("Member changed, loading entries...")
+            self.logger.debug("Member changed, loading entries")
             self.load_entries()
             self.clear_editor()
         else:
-            print("Skipping load_entries during initialization")
+            self.logger.debug("Skipping load_entries during initialization")
     
     def on_entry_selected(self, event=None):
         """Handle entry selection"""
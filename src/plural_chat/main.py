@@ -10,7 +10,6 @@ import os
 import sys
 import requests
 import sqlite3
-import re
 from urllib.parse import urlparse
 from datetime import datetime
 import logging
@@ -18,14 +17,17 @@ from logging.handlers import RotatingFileHandler
 import threading
 import time
 from pathlib import Path
+from io import BytesIO
 import platformdirs
-from functools import wraps
+from functools import wraps, lru_cache
 
 from .member_manager import MemberManager
 from .settings_manager import SettingsManager
 from PIL import Image, ImageTk
 from .database_manager import AppDatabase, SystemDatabase
-from .pluralkit_api import PluralKitSync
+from .pluralkit_api import (
+    PluralKitSync, TRUSTED_AVATAR_DOMAINS, AVATAR_EXTENSIONS, UNSAFE_FILENAME_CHARS,
+)
 # Import dialog modules
 from .pluralkit_dialog import PluralKitDialog
 from .pk_export_parser import PluralKitExportParser
@@ -38,7 +40,28 @@ from .ui.components.member_list import MemberList
 # Loading screen removed - no longer needed since database operations are fast
 
 
+@lru_cache(maxsize=512)
+def _parse_proxy_tags(proxy_tags_json: str) -> tuple:
+    """Parse a member's stored proxy tags into (prefix, suffix) pairs (cached)"""
+    # Keyed on the raw JSON string, so edited tags are simply a new cache entry
+    try:
+        proxy_tags = json.loads(proxy_tags_json)
+    except json.JSONDecodeError:
+        return ()
+
+    pairs = []
+    for tag in proxy_tags:
+        prefix = tag.get('prefix') or ''
+        suffix = tag.get('suffix') or ''
+        # Skip empty tags
+        if prefix or suffix:
+            pairs.append((prefix, suffix))
+    return tuple(pairs)
+
+
 class PluralChat:
+    _PLACEHOLDER_AVATAR = None
+
     def __init__(self):
         self.setup_logging()
         self.logger.info("Application started.")
@@ -112,6 +135,9 @@ class PluralChat:
 
         # Add a timer for debouncing the input
         self.debounce_timer = None
+        # Text the last proxy check ran against (KeyRelease also fires for
+        # arrows, Shift, etc. that don't change anything)
+        self.last_proxy_check_text = None
 
         # Setup UI and load data
         self.setup_ui()
@@ -319,6 +345,9 @@ class PluralChat:
 
     def load_members(self):
         self.members = self.system_db.get_all_members()
+        # Proxy detection only ever needs members that have proxy tags
+        self.proxy_members = [m for m in self.members if m.get('proxy_tags')]
+        self.last_proxy_check_text = None  # Tags may have changed - recheck
         # Delegate UI update to the MemberList component
         self.member_list_component.load_members(self.members)
         # Pre-load all local avatars for instant chat display
@@ -373,6 +402,15 @@ class PluralChat:
                 except Exception as e:
                     self.logger.warning(f"Failed to pre-load avatar for {member_name}: {e}")
 
+    def _get_placeholder_avatar(self):
+        """Get the shared grey placeholder avatar, creating it on first use"""
+        # One image is shared by every message whose avatar fails to load;
+        # the class attribute keeps it referenced so it isn't garbage collected
+        if PluralChat._PLACEHOLDER_AVATAR is None:
+            placeholder = Image.new('RGB', (30, 30), color='grey')
+            PluralChat._PLACEHOLDER_AVATAR = ImageTk.PhotoImage(placeholder)
+        return PluralChat._PLACEHOLDER_AVATAR
+
     def clear_image_references(self):
         """Safely clear image references to prevent memory leaks"""
         if hasattr(self.chat_history, 'image_references'):
@@ -437,41 +475,26 @@ class PluralChat:
         Detect if message matches any member's proxy tags
         Returns: (member, cleaned_message) or (None, original_message)
         """
-        if not message_text.strip():
+        # Fast path: most systems have few or no proxied members
+        if not self.proxy_members or not message_text.strip():
             return None, message_text
 
-        for member in self.members:
-            proxy_tags_json = member.get('proxy_tags')
-            if not proxy_tags_json:
-                continue
-
-            try:
-                proxy_tags = json.loads(proxy_tags_json)
+        for member in self.proxy_members:
+            for prefix, suffix in _parse_proxy_tags(member['proxy_tags']):
+                # Lazy %-args: this runs per tag on every proxy check, so don't
+                # build the string unless debug logging is actually on
+                self.logger.debug("Proxy detection debug: prefix=%r, suffix=%r", prefix, suffix)
 
-                for tag in proxy_tags:
-                    prefix = tag.get('prefix') or ''
-                    suffix = tag.get('suffix') or ''
+                # Check if message matches this proxy pattern
+                if (message_text.startswith(prefix) and message_text.endswith(suffix)):
+                    # Extract the clean message
+                    start_pos = len(prefix)
+                    end_pos = len(message_text) - len(suffix) if suffix else len(message_text)
 
-                    # Debug print
-                    self.logger.debug(f"Proxy detection debug: prefix='{prefix}' (type: {type(prefix)}), suffix='{suffix}' (type: {type(suffix)})")
-
-                    # Skip empty tags
-                    if not prefix and not suffix:
-                        continue
-
-                    # Check if message matches this proxy pattern
-                    if (message_text.startswith(prefix) and message_text.endswith(suffix)):
-                        # Extract the clean message
-                        start_pos = len(prefix)
-                        end_pos = len(message_text) - len(suffix) if suffix else len(message_text)
-
-                        if start_pos <= end_pos:
-                            clean_message = message_text[start_pos:end_pos].strip()
-                            if clean_message:  # Don't match empty messages
-                                return member, clean_message
-
-            except json.JSONDecodeError:
-                continue
+                    if start_pos <= end_pos:
+                        clean_message = message_text[start_pos:end_pos].strip()
+                        if clean_message:  # Don't match empty messages
+                            return member, clean_message
 
         return None, message_text
 
@@ -552,24 +575,13 @@ class PluralChat:
                 return False
 
             # Whitelist trusted domains
-            trusted_domains = [
-                'cdn.pluralkit.me',
-                'media.discordapp.net',
-                'cdn.discordapp.com',
-                'i.imgur.com',
-                'avatars.githubusercontent.com',
-                'localhost',  # For development
-                '127.0.0.1'   # For development
-            ]
-
-            if parsed.hostname not in trusted_domains:
+            if parsed.hostname not in TRUSTED_AVATAR_DOMAINS:
                 self.logger.warning(f"Rejected untrusted domain: {parsed.hostname}")
                 return False
 
             # Check file extension
             path = parsed.path.lower()
-            allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
-            if not any(path.endswith(ext) for ext in allowed_extensions):
+            if not path.endswith(AVATAR_EXTENSIONS):
                 self.logger.warning(f"Rejected invalid file type: {path}")
                 return False
 
@@ -583,7 +595,7 @@ class PluralChat:
     def _sanitize_filename(self, member_id: str) -> str:
         """Sanitize filename to prevent path traversal"""
         # Remove any path separators and special characters
-        safe_id = re.sub(r'[^\w\-_]', '_', str(member_id))
+        safe_id = UNSAFE_FILENAME_CHARS.sub('_', str(member_id))
         # Limit length
         safe_id = safe_id[:50]
         # Ensure it's not empty
@@ -604,6 +616,11 @@ class PluralChat:
         """Handle message text changes for live proxy detection after a debounce delay."""
         message_text = self.message_entry.get("1.0", tk.END).strip()
 
+        # Nothing changed since the last check - keep the current feedback
+        if message_text == self.last_proxy_check_text:
+            return
+        self.last_proxy_check_text = message_text
+
         # Get the default background color from the current theme to properly reset it
         try:
             style = ttk.Style()
@@ -695,7 +712,6 @@ class PluralChat:
                 self.logger.info(f"Downloaded {len(response.content)} bytes from server")
 
                 # Open image from bytes and convert to WebP
-                from io import BytesIO
                 original_image = Image.open(BytesIO(response.content))
                 self.logger.info(f"Opened image: {original_image.size} pixels, mode: {original_image.mode}")
 
@@ -876,16 +892,8 @@ class PluralChat:
                 self.logger.error(f"Failed to insert avatar for {member_name} in send_message: {e}")
                 # Create a simple placeholder if avatar loading fails
                 try:
-                    placeholder = Image.new('RGB', (30, 30), color='grey')
-                    placeholder_image = ImageTk.PhotoImage(placeholder)
+                    placeholder_image = self._get_placeholder_avatar()
                     self.chat_history.image_create(tk.END, image=placeholder_image, padx=5)
-                    # Keep both chat and global references
-                    if not hasattr(self.chat_history, 'image_references'):
-                        self.chat_history.image_references = []
-                    self.chat_history.image_references.append(placeholder_image)
-                    if not hasattr(self, 'avatar_references'):
-                        self.avatar_references = []
-                    self.avatar_references.append(placeholder_image)
                 except Exception as placeholder_e:
                     self.logger.error(f"Failed to create placeholder for {member_name} in send_message: {placeholder_e}")
 
@@ -933,48 +941,47 @@ class PluralChat:
         messages = self.system_db.get_messages(limit=1000)
         messages.reverse()  # Show oldest first
 
-        for message in messages:
-            self.display_loaded_message(message)
+        self._render_chat_history(messages)
 
         self.chat_history.config(state=DISABLED)
 
-    def display_loaded_message(self, message_data):
-        member_name = message_data.get('member_name', 'Unknown')
-        message_text = message_data.get('message', '')
-        timestamp = message_data.get('timestamp', '')
-
-        # Insert avatar if available
-        if member_name in self.avatar_cache:
+    def _render_chat_history(self, messages):
+        """Insert all loaded messages with a single text insert, then add avatars"""
+        # Every insert makes the Text widget re-layout, so build one
+        # (text, tags, text, tags, ...) argument list for the whole history
+        # and remember which lines need an avatar at their start
+        segments = []
+        avatar_lines = []
+        line = 1
+        for message_data in messages:
+            member_name = message_data.get('member_name', 'Unknown')
+            message_text = message_data.get('message', '')
+            timestamp = message_data.get('timestamp', '')
+
+            if member_name in self.avatar_cache:
+                avatar_lines.append((line, member_name))
+
+            body = f"  {message_text}\n\n"
+            segments.extend((f" {member_name} [{timestamp}]\n", "header", body, ()))
+            line += 1 + body.count("\n")
+
+        if segments:
+            self.chat_history.insert(tk.END, *segments)
+
+        # An embedded image sits on its own line without shifting line numbers
+        for line, member_name in avatar_lines:
             try:
                 image_to_display = self.avatar_cache[member_name]
-                self.chat_history.image_create(tk.END, image=image_to_display, padx=5)
-                # Explicitly store a reference on the text widget to prevent garbage collection
-                if not hasattr(self.chat_history, 'image_references'):
-                    self.chat_history.image_references = []
+                self.chat_history.image_create(f"{line}.0", image=image_to_display, padx=5)
                 self.chat_history.image_references.append(image_to_display)
-                self.logger.debug(f"Inserted avatar for {member_name}")
             except Exception as e:
                 self.logger.error(f"Failed to insert avatar for {member_name}: {e}")
-                # Create a simple placeholder if avatar loading fails
                 try:
-                    placeholder = Image.new('RGB', (30, 30), color='grey')
-                    placeholder_image = ImageTk.PhotoImage(placeholder)
-                    self.chat_history.image_create(tk.END, image=placeholder_image, padx=5)
-                    # Keep both chat and global references
-                    if not hasattr(self.chat_history, 'image_references'):
-                        self.chat_history.image_references = []
-                    self.chat_history.image_references.append(placeholder_image)
-                    if not hasattr(self, 'avatar_references'):
-                        self.avatar_references = []
-                    self.avatar_references.append(placeholder_image)
+                    placeholder_image = self._get_placeholder_avatar()
+                    self.chat_history.image_create(f"{line}.0", image=placeholder_image, padx=5)
                 except Exception as placeholder_e:
                     self.logger.error(f"Failed to create placeholder for {member_name}: {placeholder_e}")
 
-        # Insert message
-        header = f" {member_name} [{timestamp}]\n"
-        self.chat_history.insert(tk.END, header, "header")
-        self.chat_history.insert(tk.END, f"  {message_text}\n\n")
-
     def show_pluralkit_dialog(self):
         """Show PluralKit integration dialog"""
         dialog = PluralKitDialog(self.root, self.pk_sync, self.refresh_members)
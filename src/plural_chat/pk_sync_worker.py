@@ -8,12 +8,26 @@ import sys
 import json
 import time
 import os
+import threading
 from pathlib import Path
+import platformdirs
+try:
+    import orjson  # Optional: faster status serialization
+except ImportError:
+    orjson = None
 from database_manager import SystemDatabase, AppDatabase
 from pluralkit_api import PluralKitSync
 from aria2_avatar_downloader import Aria2AvatarDownloader
 import logging
 
+# Configure the worker logger once at import, not per worker instance
+logger = logging.getLogger('pk_sync_worker')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(_handler)
+
 class PKSyncWorker:
     def __init__(self, status_file, operation, download_avatars=True):
         self.status_file = status_file
@@ -25,45 +39,82 @@ class PKSyncWorker:
         self.system_db = SystemDatabase()
         self.pk_sync = PluralKitSync(self.system_db, self.app_db)
         
-        # Setup logging
-        self.logger = logging.getLogger('pk_sync_worker')
-        self.logger.setLevel(logging.INFO)
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+        self.logger = logger
         
-        # Rate limiting for status updates to prevent UI flooding
-        self.last_status_time = 0
-        self.min_status_interval = 0.5  # At least 500ms between status updates
+        # Status updates are buffered latest-wins and written by a background
+        # flusher at most once per interval, so bursts can't flood the UI and
+        # the last update in a burst is never dropped
+        self.min_status_interval = 0.5  # At least 500ms between status writes
+        self.final_flush_attempts = 10  # Retries for the last status before exit
+        self._pending = None
+        self._last_key = None  # (status, message, progress) of the last queued update
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
         
     def write_status(self, status, message="", progress=0, data=None):
-        """Write status to file for main app to read with rate limiting"""
-        current_time = time.time()
-        
-        # Rate limit: don't write status more than once per interval
-        if current_time - self.last_status_time < self.min_status_interval:
-            return  # Skip update if too frequent
+        """Queue a status update for the main app to read (latest update wins)"""
+        # Nothing the user can see changed - don't bother re-writing the file
+        key = (status, message, int(progress))
+        if key == self._last_key:
+            return
         
         status_data = {
             "status": status,  # "running", "complete", "error"
             "message": message,
             "progress": progress,  # 0-100
-            "timestamp": current_time,
+            "timestamp": time.time(),
             "data": data or {}
         }
         
-        try:
-            # Write to a temporary file first to avoid race conditions
-            temp_file = self.status_file + ".tmp"
-            with open(temp_file, 'w') as f:
-                json.dump(status_data, f)
-            # Atomically move the temp file to the real file
-            os.rename(temp_file, self.status_file)
-            self.last_status_time = current_time
-        except Exception as e:
-            print(f"Failed to write status: {e}")
+        with self._pending_lock:
+            self._pending = status_data
+            self._last_key = key
+    
+    def _flush_loop(self):
+        """Background thread: write the most recent pending status every interval"""
+        while True:
+            time.sleep(self.min_status_interval)
+            self.flush()
+    
+    def flush(self):
+        """
+        Write the pending status (if any) to the status file immediately.
+        Returns False if the write failed and the update is still pending
+        """
+        # Hold the write lock while taking the pending update so an older
+        # snapshot can never be written after a newer one
+        with self._write_lock:
+            with self._pending_lock:
+                status_data = self._pending
+                self._pending = None
+            
+            if status_data is None:
+                return True
+            
+            try:
+                # Write to a temporary file first to avoid race conditions
+                temp_file = self.status_file + ".tmp"
+                if orjson is not None:
+                    with open(temp_file, 'wb') as f:
+                        f.write(orjson.dumps(status_data))
+                else:
+                    with open(temp_file, 'w') as f:
+                        json.dump(status_data, f)
+                # Atomically move the temp file to the real file (os.replace also
+                # overwrites an existing file on Windows, unlike os.rename)
+                os.replace(temp_file, self.status_file)
+            except Exception as e:
+                self.logger.error(f"Failed to write status: {e}")
+                # Requeue the snapshot so the next flush retries it (e.g. the
+                # dialog had the file open on Windows), unless a newer one
+                # was queued meanwhile
+                with self._pending_lock:
+                    if self._pending is None:
+                        self._pending = status_data
+                return False
+        return True
     
     def run_sync_members(self):
         """Run member sync operation"""
@@ -83,11 +134,8 @@ class PKSyncWorker:
                 self.write_status("error", f"Connection failed: {message}")
                 return
             
-            self.write_status("running", "Syncing members...", 30)
-            
             # Perform sync (without downloading avatars - we'll use aria2 for that)
-            # Update status to indicate we're starting member sync
-            self.write_status("running", "Syncing members from PluralKit...", 25)
+            self.write_status("running", "Syncing members from PluralKit...", 30)
             new_count, updated_count, errors = self.pk_sync.sync_members(download_avatars=False)
             
             self.write_status("running", "Members synced, checking avatars...", 60)
@@ -112,27 +160,30 @@ class PKSyncWorker:
     
     def _download_avatars_with_aria2(self):
         """Download all member avatars using aria2 for maximum speed"""
+        # Get all members that might need avatar downloads (read once, also
+        # reused by the fallback below)
         try:
-            # Get all members that might need avatar downloads
             members = self.system_db.get_all_members()
-            
+        except Exception as e:
+            self.logger.error(f"Could not load members for avatar download: {e}")
+            return
+        
+        try:
             def status_callback(status, message, progress=60):
                 # Map aria2 progress to our overall progress (60-95%)
                 # Only update if status changed significantly or enough time has passed
                 overall_progress = 60 + (progress * 0.35)  
                 self.write_status("running", f"🚀 {message}", int(overall_progress))
-                # Add a small delay to allow UI to process other events
-                time.sleep(0.05)  # Small delay to prevent overwhelming the UI
             
             # Create aria2 downloader
             downloader = Aria2AvatarDownloader(self.logger, status_callback)
             
             # Check if aria2 is available
             if not downloader.check_aria2_available():
-                self.logger.warning("aria2c not found, falling back to sequential downloads")
+                self.logger.warning("aria2c not found, falling back to built-in downloader")
                 self.write_status("running", "aria2 not found, using slower method...", 70)
                 # Fallback to original method
-                self._download_avatars_sequential(members)
+                self._download_avatars_fallback(members)
                 return
             
             # Use aria2 for blazing fast downloads
@@ -142,46 +193,42 @@ class PKSyncWorker:
             if success:
                 self.logger.info("✅ aria2 avatar download completed successfully")
             else:
-                self.logger.warning("aria2 failed, falling back to sequential downloads")
-                self._download_avatars_sequential(members)
+                self.logger.warning("aria2 failed, falling back to built-in downloader")
+                self._download_avatars_fallback(members)
                 
         except Exception as e:
             self.logger.error(f"Error in aria2 avatar download: {e}")
-            # Fallback to sequential if aria2 fails
+            # Fall back to the built-in downloader if aria2 fails
             try:
-                members = self.system_db.get_all_members()
-                self._download_avatars_sequential(members)
+                self._download_avatars_fallback(members)
             except Exception as fallback_error:
                 self.logger.error(f"Fallback avatar download also failed: {fallback_error}")
     
-    def _download_avatars_sequential(self, members):
-        """Fallback method for avatar downloads without aria2"""
+    def _download_avatars_fallback(self, members):
+        """Download avatars through PluralKitSync when aria2 is unavailable"""
         try:
-            self.write_status("running", "Downloading avatars (sequential)...", 70)
-            
-            # Use the original PluralKit sync method
-            avatar_count = 0
-            for i, member in enumerate(members):
-                avatar_url = member.get('avatar_path', '')
-                if avatar_url and avatar_url.startswith(('http://', 'https://')):
-                    try:
-                        # This would call the original avatar download logic
-                        # For now, just log it
-                        self.logger.info(f"Would download avatar for {member.get('name', 'unknown')}")
-                        avatar_count += 1
-                        
-                        # Update progress
-                        if i % 10 == 0:
-                            progress = 70 + (i / len(members)) * 25  # 70-95%
-                            self.write_status("running", f"Downloaded {avatar_count} avatars...", int(progress))
-                            
-                    except Exception as e:
-                        self.logger.warning(f"Failed to download avatar for {member.get('name', 'unknown')}: {e}")
-            
-            self.logger.info(f"Sequential avatar download completed: {avatar_count} avatars")
+            self.write_status("running", "Downloading avatars (without aria2)...", 70)
+            
+            avatar_dir = str(Path(platformdirs.user_data_dir("PluralChat", "DuskfallCrew")) / "avatars")
+            
+            def report(done, total, downloaded):
+                # At most ~20 progress updates, spread over 70-95%
+                if done % max(1, total // 20) == 0 or done == total:
+                    progress = 70 + (done / total) * 25
+                    self.write_status("running", f"Downloaded {downloaded} avatars...", int(progress))
+            
+            # download_avatar validates, retries and converts to WebP
+            results = self.pk_sync.download_member_avatars(members, avatar_dir, progress_callback=report)
+            updates = [(member['id'], local_path) for member, local_path in results if local_path]
+            avatar_count = len(updates)
+            
+            # Point members at their local files in one transaction
+            self.system_db.update_member_avatars(updates)
+            
+            self.logger.info(f"Fallback avatar download completed: {avatar_count} avatars")
             
         except Exception as e:
-            self.logger.error(f"Error in sequential avatar download: {e}")
+            self.logger.error(f"Error in fallback avatar download: {e}")
     
     def run_full_import(self):
         """Run full system import operation"""
@@ -201,10 +248,8 @@ class PKSyncWorker:
                 self.write_status("error", f"Connection failed: {message}")
                 return
             
-            self.write_status("running", "Importing system...", 30)
-            
             # Perform import with better progress tracking
-            self.write_status("running", "Importing system data...", 25)
+            self.write_status("running", "Importing system data...", 30)
             success, message, stats = self.pk_sync.import_full_system(self.download_avatars)
             
             if success:
@@ -217,7 +262,7 @@ class PKSyncWorker:
     
     def run(self):
         """Run the specified operation"""
-        print(f"Starting PK worker: {self.operation}")
+        self.logger.info(f"Starting PK worker: {self.operation}")
         
         if self.operation == "sync":
             self.run_sync_members()
@@ -225,6 +270,13 @@ class PKSyncWorker:
             self.run_full_import()
         else:
             self.write_status("error", f"Unknown operation: {self.operation}")
+        
+        # Make sure the final complete/error state reaches the status file,
+        # retrying briefly if the write fails
+        for _ in range(self.final_flush_attempts):
+            if self.flush():
+                break
+            time.sleep(self.min_status_interval)
 
 def main():
     if len(sys.argv) < 3:
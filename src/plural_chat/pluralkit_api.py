@@ -2,23 +2,48 @@ import requests
 import json
 import time
 import re
+import os
+from io import BytesIO
+from PIL import Image
 from urllib.parse import urlparse
 from typing import List, Dict, Optional
 from datetime import datetime
 import logging
 from logging.handlers import RotatingFileHandler
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Characters not allowed in avatar filenames. The name variant keeps spaces,
+# which _sanitize_filename turns into underscores itself
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\-_]')
+UNSAFE_NAME_CHARS = re.compile(r'[^\w\-_\s]')
+
+# Avatar URL allow-lists, built once instead of on every validation
+TRUSTED_AVATAR_DOMAINS = frozenset({
+    'cdn.pluralkit.me',
+    'media.discordapp.net',
+    'cdn.discordapp.com',
+    'i.imgur.com',
+    'avatars.githubusercontent.com',
+    'localhost',  # For development
+    '127.0.0.1',  # For development
+})
+AVATAR_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
 
 
 class PluralKitAPI:
     """PluralKit API integration for member import/sync"""
     
     BASE_URL = "https://api.pluralkit.me/v2"
+    SYSTEM_CACHE_TTL = 60  # Seconds to reuse a successful /systems/@me response
     
     def __init__(self, token: str = None):
         self.token = token
         self.headers = {"Authorization": token} if token else {}
         self.logger = logging.getLogger('plural_chat.pluralkit_api')
+        # Reuse keep-alive connections instead of a new TCP+TLS handshake per call
+        self.session = requests.Session()
+        self._system_cache = None  # (fetched_at, system_data)
 
     def retry_on_failure(self, max_retries=3, delay=1, backoff=2, exceptions=(requests.RequestException,)):
         """
@@ -44,6 +69,9 @@ class PluralKitAPI:
     
     def set_token(self, token: str):
         """Set or update the API token"""
+        if token != self.token:
+            # Cached system info belongs to the previous token
+            self._system_cache = None
         self.token = token
         self.headers = {"Authorization": token}
     
@@ -55,7 +83,7 @@ class PluralKitAPI:
         
         for attempt in range(max_retries):
             try:
-                response = requests.request(method, url, headers=self.headers, **kwargs)
+                response = self.session.request(method, url, headers=self.headers, **kwargs)
                 
                 # Don't retry on 4xx errors (client errors), only on 5xx/server issues
                 if response.status_code < 500 and response.status_code != 429:
@@ -92,24 +120,45 @@ class PluralKitAPI:
         # This shouldn't be reached due to the return statements, but just in case
         raise requests.exceptions.RequestException("Max retries exceeded")
     
+    def _fetch_own_system(self, use_cache: bool = True) -> tuple[int, Optional[Dict]]:
+        """
+        GET /systems/@me, reusing a recent successful response unless
+        use_cache is False
+        Returns: (status_code, system_data or None)
+        """
+        if not use_cache:
+            self._system_cache = None
+        elif self._system_cache:
+            fetched_at, system_data = self._system_cache
+            if time.monotonic() - fetched_at < self.SYSTEM_CACHE_TTL:
+                return 200, system_data
+        
+        response = self._make_api_request('GET', f"{self.BASE_URL}/systems/@me", timeout=10)
+        if response.status_code != 200:
+            return response.status_code, None
+        
+        system_data = response.json()
+        self._system_cache = (time.monotonic(), system_data)
+        return 200, system_data
+    
     def test_connection(self) -> tuple[bool, str]:
         """Test if the API token works"""
         if not self.token:
             return False, "No token provided"
         
         try:
-            response = self._make_api_request('GET', f"{self.BASE_URL}/systems/@me", timeout=10)
+            # Always ask the API: a connection check must not answer from cache
+            status_code, system_data = self._fetch_own_system(use_cache=False)
             
-            if response.status_code == 200:
-                system_data = response.json()
+            if status_code == 200:
                 system_name = system_data.get("name", "Unnamed System")
                 return True, f"Connected to system: {system_name}"
-            elif response.status_code == 401:
+            elif status_code == 401:
                 return False, "Invalid token"
-            elif response.status_code == 403:
+            elif status_code == 403:
                 return False, "Token lacks required permissions"
             else:
-                return False, f"API error: {response.status_code}"
+                return False, f"API error: {status_code}"
                 
         except requests.exceptions.RequestException as e:
             return False, f"Connection error: {str(e)}"
@@ -120,12 +169,8 @@ class PluralKitAPI:
             return None
         
         try:
-            response = self._make_api_request('GET', f"{self.BASE_URL}/systems/@me", timeout=10)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return None
+            status_code, system_data = self._fetch_own_system()
+            return system_data
                 
         except requests.exceptions.RequestException:
             return None
@@ -192,23 +237,12 @@ class PluralKitAPI:
                 return False
             
             # Whitelist trusted domains
-            trusted_domains = [
-                'cdn.pluralkit.me',
-                'media.discordapp.net', 
-                'cdn.discordapp.com',
-                'i.imgur.com',
-                'avatars.githubusercontent.com',
-                'localhost',
-                '127.0.0.1'
-            ]
-            
-            if parsed.hostname not in trusted_domains:
+            if parsed.hostname not in TRUSTED_AVATAR_DOMAINS:
                 return False
             
             # Check file extension
             path = parsed.path.lower()
-            allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
-            if not any(path.endswith(ext) for ext in allowed_extensions):
+            if not path.endswith(AVATAR_EXTENSIONS):
                 return False
             
             return True
@@ -219,7 +253,7 @@ class PluralKitAPI:
     def _sanitize_filename(self, member_name: str) -> str:
         """Sanitize filename to prevent path traversal"""
         # Remove any path separators and special characters
-        safe_name = re.sub(r'[^\w\-_\s]', '_', str(member_name))
+        safe_name = UNSAFE_NAME_CHARS.sub('_', str(member_name))
         # Replace spaces with underscores
         safe_name = safe_name.replace(' ', '_')
         # Limit length
@@ -239,10 +273,6 @@ class PluralKitAPI:
             self.logger.warning(f"Avatar URL failed security validation: {avatar_url}")
             return None
         
-        import os
-        from PIL import Image
-        from io import BytesIO
-        
         try:
             # Create avatars directory with secure permissions
             os.makedirs(avatar_dir, exist_ok=True)
@@ -264,7 +294,7 @@ class PluralKitAPI:
             max_retries = 3
             for attempt in range(max_retries):
                 try:
-                    response = requests.get(avatar_url, timeout=30)
+                    response = self.session.get(avatar_url, timeout=30)
                     if response.status_code == 200:
                         break
                     elif response.status_code == 429:  # Rate limited
@@ -368,11 +398,73 @@ class PluralKitAPI:
 class PluralKitSync:
     """Handles syncing between PluralKit and local database"""
     
+    # Avatar downloads are network-bound; a few in flight hides latency
+    # without hammering the CDN (download_avatar still backs off on 429)
+    AVATAR_DOWNLOAD_WORKERS = 4
+    
     def __init__(self, system_db, app_db):
         self.system_db = system_db
         self.app_db = app_db
         self.api = PluralKitAPI()
         self.logger = logging.getLogger('plural_chat.pluralkit_sync')
+        # Let every download worker keep its own pooled connection
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.AVATAR_DOWNLOAD_WORKERS)
+        self.api.session.mount("https://", adapter)
+    
+    def download_member_avatars(self, members: List[Dict], avatar_dir: str = "avatars",
+                                progress_callback=None) -> List[tuple]:
+        """
+        Download avatars for every member whose avatar_path is still a URL,
+        a few at a time, without modifying the members.
+        progress_callback(done, total, downloaded) is called after each file.
+        Returns: [(member, local_path or None), ...]
+        """
+        # Members whose names sanitize to the same filename share one file,
+        # so download each target once rather than racing writers on it
+        groups: Dict[str, List[Dict]] = {}
+        for member in members:
+            if (member.get("avatar_path") or "").startswith(("http://", "https://")):
+                key = self.api._sanitize_filename(member.get("name", "unknown"))
+                groups.setdefault(key, []).append(member)
+        
+        results = []
+        if not groups:
+            return results
+        
+        downloaded = 0
+        with ThreadPoolExecutor(max_workers=self.AVATAR_DOWNLOAD_WORKERS) as executor:
+            futures = {
+                executor.submit(self.api.download_avatar, group[0]["avatar_path"],
+                                group[0].get("name", "unknown"), avatar_dir): group
+                for group in groups.values()
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                group = futures[future]
+                try:
+                    local_path = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Failed to download avatar for {group[0].get('name', 'unknown')}: {e}")
+                    local_path = None
+                for member in group:
+                    results.append((member, local_path))
+                    if local_path:
+                        downloaded += 1
+                if progress_callback:
+                    progress_callback(done, len(futures), downloaded)
+        return results
+    
+    def _download_avatars(self, members: List[Dict]) -> int:
+        """
+        Download avatars for converted members, replacing each avatar_path
+        URL with the local path (or None on failure).
+        Returns the number of avatars downloaded
+        """
+        downloaded = 0
+        for member, local_path in self.download_member_avatars(members):
+            member["avatar_path"] = local_path
+            if local_path:
+                downloaded += 1
+        return downloaded
     
     def setup_token(self, token: str) -> tuple[bool, str]:
         """Set up and test PluralKit token"""
@@ -422,36 +514,38 @@ class PluralKitSync:
         updated_count = 0
         errors = []
         
-        for i, pk_member in enumerate(pk_members):
+        # Convert up front so avatars can be fetched concurrently before the
+        # (sequential) database pass
+        converted = []
+        for pk_member in pk_members:
+            try:
+                converted.append((pk_member, self.api.convert_pk_member_to_local(pk_member)))
+            except Exception as e:
+                errors.append(f"Error processing {pk_member.get('name', 'unknown')}: {str(e)}")
+        
+        if download_avatars:
+            self._download_avatars([local_member_data for _, local_member_data in converted])
+        
+        # Load local members once and index them, instead of re-reading the
+        # whole members table for every PluralKit member
+        members_by_pk_id = {}
+        members_by_name = {}
+        for member in self.system_db.get_member_keys():
+            if member.get("pk_id"):
+                members_by_pk_id.setdefault(member["pk_id"], member)
+            members_by_name.setdefault(member["name"], member)
+        
+        for i, (pk_member, local_member_data) in enumerate(converted):
             try:
                 member_name = pk_member.get("name", "Unknown")
-                self.logger.info(f"Processing member {i+1}/{len(pk_members)}: {member_name}")
+                self.logger.info(f"Processing member {i+1}/{len(converted)}: {member_name}")
                 
-                # Add small delay between members to avoid rate limits
-                if i > 0 and download_avatars:
-                    time.sleep(0.5)  # 500ms delay between avatar downloads
-                
-                local_member_data = self.api.convert_pk_member_to_local(pk_member)
                 pk_id = local_member_data["pk_id"]
                 
                 # Check if member already exists
-                existing_members = self.system_db.get_all_members()
-                existing_member = None
-                for member in existing_members:
-                    if member.get("pk_id") == pk_id or member.get("name") == local_member_data["name"]:
-                        existing_member = member
-                        break
-                
-                # Download avatar if requested
-                if download_avatars and local_member_data["avatar_path"]:
-                    local_avatar_path = self.api.download_avatar(
-                        local_member_data["avatar_path"], 
-                        local_member_data["name"]
-                    )
-                    if local_avatar_path:
-                        local_member_data["avatar_path"] = local_avatar_path
-                    else:
-                        local_member_data["avatar_path"] = None
+                existing_member = members_by_pk_id.get(pk_id) if pk_id else None
+                if existing_member is None:
+                    existing_member = members_by_name.get(local_member_data["name"])
                 
                 if existing_member:
                     # Update existing member
@@ -462,10 +556,16 @@ class PluralKitSync:
                     # Update PK ID if it wasn't set
                     if not existing_member.get("pk_id") and pk_id:
                         self.system_db.update_member(existing_member["id"], pk_id=pk_id)
+                        existing_member["pk_id"] = pk_id
+                        members_by_pk_id[pk_id] = existing_member
                     updated_count += 1
                 else:
                     # Add new member
-                    self.system_db.add_member(**local_member_data)
+                    member_id = self.system_db.add_member(**local_member_data)
+                    new_member = dict(local_member_data, id=member_id)
+                    if pk_id:
+                        members_by_pk_id[pk_id] = new_member
+                    members_by_name[new_member["name"]] = new_member
                     new_count += 1
                     
             except Exception as e:
@@ -512,29 +612,27 @@ class PluralKitSync:
                 if system_info.get("tag"):
                     self.system_db.set_system_info("system_tag", system_info["tag"])
             
-            # Import members
+            # Convert members, then fetch their avatars concurrently
+            converted = []
             for pk_member in pk_members:
                 try:
-                    local_member_data = self.api.convert_pk_member_to_local(pk_member)
-                    
-                    # Download avatar if requested
-                    if download_avatars and local_member_data["avatar_path"]:
-                        local_avatar_path = self.api.download_avatar(
-                            local_member_data["avatar_path"], 
-                            local_member_data["name"]
-                        )
-                        if local_avatar_path:
-                            local_member_data["avatar_path"] = local_avatar_path
-                            stats["avatars_downloaded"] += 1
-                        else:
-                            local_member_data["avatar_path"] = None
-                    
-                    self.system_db.add_member(**local_member_data)
-                    stats["members_imported"] += 1
-                    
+                    converted.append((pk_member, self.api.convert_pk_member_to_local(pk_member)))
                 except Exception as e:
                     stats["errors"].append(f"Error importing {pk_member.get('name', 'unknown')}: {str(e)}")
             
+            if download_avatars:
+                stats["avatars_downloaded"] = self._download_avatars(
+                    [local_member_data for _, local_member_data in converted]
+                )
+            
+            # Import members in one transaction
+            results = self.system_db.add_members([local_member_data for _, local_member_data in converted])
+            for (pk_member, _), (member_id, error) in zip(converted, results):
+                if error:
+                    stats["errors"].append(f"Error importing {pk_member.get('name', 'unknown')}: {error}")
+                else:
+                    stats["members_imported"] += 1
+            
             # Update sync timestamp
             self.app_db.update_sync_time("pluralkit")
             
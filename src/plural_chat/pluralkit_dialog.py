@@ -11,6 +11,8 @@ from datetime import datetime
 import logging
 from logging.handlers import RotatingFileHandler
 
+from .database_manager import EncryptionKeyError
+
 
 class PluralKitDialog:
     """Dialog for PluralKit integration setup and sync"""
@@ -64,7 +66,11 @@ class PluralKitDialog:
         self.token_entry.pack(fill=X, pady=(0, 10))
         
         # Check if token already exists
-        existing_token = self.pk_sync.app_db.get_api_token("pluralkit")
+        try:
+            existing_token = self.pk_sync.app_db.get_api_token("pluralkit")
+        except EncryptionKeyError as e:
+            existing_token = None
+            messagebox.showerror("Token Storage Error", str(e))
         if existing_token:
             self.token_entry.insert(0, existing_token)
         
@@ -145,7 +151,12 @@ class PluralKitDialog:
             messagebox.showerror("Error", "Please enter a token")
             return
         
-        success, message = self.pk_sync.setup_token(token)
+        try:
+            success, message = self.pk_sync.setup_token(token)
+        except EncryptionKeyError as e:
+            self.status_label.config(text="✗ Token could not be stored securely", bootstyle="danger")
+            messagebox.showerror("Token Storage Error", str(e))
+            return
         
         if success:
             self.status_label.config(text=f"✓ Token saved: {message}", bootstyle="success")
@@ -154,9 +165,23 @@ class PluralKitDialog:
             self.status_label.config(text=f"✗ {message}", bootstyle="danger")
             messagebox.showerror("Error", f"Failed to save token: {message}")
     
+    def _load_saved_token(self):
+        """
+        Load the saved token. Returns True/False, or None after reporting an
+        encryption key that can't be loaded
+        """
+        try:
+            return self.pk_sync.load_saved_token()
+        except EncryptionKeyError as e:
+            messagebox.showerror("Token Storage Error", str(e))
+            return None
+    
     def check_connection_status(self):
         """Check if saved token still works"""
-        if self.pk_sync.load_saved_token():
+        loaded = self._load_saved_token()
+        if loaded is None:
+            self.status_label.config(text="✗ Saved token could not be decrypted", bootstyle="danger")
+        elif loaded:
             success, message = self.pk_sync.api.test_connection()
             if success:
                 self.status_label.config(text=f"✓ Connected: {message}", bootstyle="success")
@@ -167,7 +192,10 @@ class PluralKitDialog:
     
     def sync_members(self):
         """Sync members from PluralKit using separate process"""
-        if not self.pk_sync.load_saved_token():
+        loaded = self._load_saved_token()
+        if loaded is None:
+            return
+        if not loaded:
             messagebox.showerror("Error", "Please save a valid token first")
             return
         
@@ -278,7 +306,10 @@ class PluralKitDialog:
                                   "This will replace all existing members. Continue?"):
             return
         
-        if not self.pk_sync.load_saved_token():
+        loaded = self._load_saved_token()
+        if loaded is None:
+            return
+        if not loaded:
             messagebox.showerror("Error", "Please save a valid token first")
             return
         
@@ -385,9 +416,10 @@ class PluralKitDialog:
         self.sync_button.config(state=NORMAL, text="Sync Members")  # Restore original text
         
         if errors:
-            error_msg = "\n".join(errors[:5])  # Show first 5 errors
+            shown_errors = errors[:5]  # Show first 5 errors
             if len(errors) > 5:
-                error_msg += f"\n... and {len(errors) - 5} more errors"
+                shown_errors.append(f"... and {len(errors) - 5} more errors")
+            error_msg = "\n".join(shown_errors)
             
             self.progress_label.config(text=f"Sync completed with errors")
             messagebox.showwarning("Sync Warning", 
@@ -407,11 +439,11 @@ class PluralKitDialog:
         
         if success:
             self.progress_label.config(text="Import complete")
-            details = f"Members imported: {stats['members_imported']}\n"
-            details += f"Avatars downloaded: {stats['avatars_downloaded']}"
-            
-            if stats['errors']:
-                details += f"\nErrors: {len(stats['errors'])}"
+            details = "\n".join(part for part in (
+                f"Members imported: {stats['members_imported']}",
+                f"Avatars downloaded: {stats['avatars_downloaded']}",
+                f"Errors: {len(stats['errors'])}" if stats['errors'] else None,
+            ) if part)
             
             messagebox.showinfo("Import Complete", f"{message}\n\n{details}")
         else:
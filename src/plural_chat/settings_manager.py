@@ -6,6 +6,27 @@ from ttkbootstrap.constants import *
 from .member_manager import MemberManager
 from .ui.themes.manager import ThemeManager
 
+# Font families don't change while the app is running, so build the list once
+_FONT_LIST_CACHE = None
+
+
+def _get_font_list():
+    """Get installed font families with common monospace fonts first (cached)"""
+    global _FONT_LIST_CACHE
+    if _FONT_LIST_CACHE is None:
+        available_fonts = sorted(f for f in font.families() if not f.startswith('@'))
+        # Add some common monospace fonts at the top
+        priority_fonts = ['Consolas', 'Monaco', 'Courier New', 'Courier', 'monospace']
+        font_list = []
+        for pf in priority_fonts:
+            if pf in available_fonts:
+                font_list.append(pf)
+                available_fonts.remove(pf)
+        font_list.extend(available_fonts)
+        _FONT_LIST_CACHE = font_list
+    return _FONT_LIST_CACHE
+
+
 class SettingsManager(ttk.Toplevel):
     def __init__(self, parent_window, parent_app):
         super().__init__(parent_window)
@@ -27,13 +48,28 @@ class SettingsManager(ttk.Toplevel):
         self.notebook.add(self.general_tab, text="General")
         self.notebook.add(self.members_tab, text="Members")
 
-        # General Tab Content
-        general_frame = ttk.Frame(self.general_tab, padding=10)
-        general_frame.pack(fill=tk.BOTH, expand=True)
+        # General Tab Content - the frame shell is created now, the widgets are
+        # populated once the dialog has been drawn so it opens immediately
+        self.general_frame = ttk.Frame(self.general_tab, padding=10)
+        self.general_frame.pack(fill=tk.BOTH, expand=True)
+        self.general_tab_populated = False
+        self.after_idle(self._populate_general_tab)
+
+        # Lazy load MemberManager
+        self.member_manager_frame = None
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
+
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+    def _populate_general_tab(self):
+        """Build the General tab widgets (deferred from __init__)"""
+        if self.general_tab_populated:
+            return
+        self.general_tab_populated = True
 
         # Theme Management
-        ttk.Label(general_frame, text="Select Theme:").pack(anchor=tk.W, pady=(0, 5))
-        self.theme_selector = ttk.Combobox(general_frame, state="readonly")
+        ttk.Label(self.general_frame, text="Select Theme:").pack(anchor=tk.W, pady=(0, 5))
+        self.theme_selector = ttk.Combobox(self.general_frame, state="readonly")
         
         # Get all available themes from the ThemeManager
         all_themes = self.parent.theme_manager.get_available_themes()
@@ -44,16 +80,16 @@ class SettingsManager(ttk.Toplevel):
         self.theme_selector.bind("<<ComboboxSelected>>", self.on_theme_selected)
         
         # Theme description label
-        self.theme_description = ttk.Label(general_frame, text="", font=("Arial", 9), bootstyle="secondary")
+        self.theme_description = ttk.Label(self.general_frame, text="", font=("Arial", 9), bootstyle="secondary")
         self.theme_description.pack(fill=tk.X, pady=(0, 15))
         
         # Update initial theme description
         self.update_theme_description()
 
         # Font Selection
-        ttk.Label(general_frame, text="Font Settings:").pack(anchor=tk.W, pady=(15, 5))
+        ttk.Label(self.general_frame, text="Font Settings:").pack(anchor=tk.W, pady=(15, 5))
         
-        font_frame = ttk.Frame(general_frame)
+        font_frame = ttk.Frame(self.general_frame)
         font_frame.pack(fill=tk.X, pady=(0, 10))
         
         # Font family
@@ -62,18 +98,8 @@ class SettingsManager(ttk.Toplevel):
         self.font_family_combo = ttk.Combobox(font_frame, textvariable=self.font_family_var, 
                                             state="readonly", width=15)
         
-        # Get available fonts
-        available_fonts = sorted([f for f in font.families() if not f.startswith('@')])
-        # Add some common monospace fonts at the top
-        priority_fonts = ['Consolas', 'Monaco', 'Courier New', 'Courier', 'monospace']
-        font_list = []
-        for pf in priority_fonts:
-            if pf in available_fonts:
-                font_list.append(pf)
-                available_fonts.remove(pf)
-        font_list.extend(available_fonts)
-        
-        self.font_family_combo['values'] = font_list
+        # Get available fonts (cached after the first open)
+        self.font_family_combo['values'] = _get_font_list()
         current_font = self.parent.app_db.get_setting('font_family', 'Consolas')
         self.font_family_combo.set(current_font)
         self.font_family_combo.pack(side=tk.LEFT, padx=(0, 10))
@@ -93,8 +119,8 @@ class SettingsManager(ttk.Toplevel):
         apply_font_button.pack(side=tk.LEFT)
         
         # Window Sizing
-        ttk.Label(general_frame, text="Window Size (WxH):").pack(anchor=tk.W, pady=(15, 5))
-        size_frame = ttk.Frame(general_frame)
+        ttk.Label(self.general_frame, text="Window Size (WxH):").pack(anchor=tk.W, pady=(15, 5))
+        size_frame = ttk.Frame(self.general_frame)
         size_frame.pack(fill=tk.X, pady=(0, 10))
 
         self.width_entry = ttk.Entry(size_frame, width=8)
@@ -103,7 +129,7 @@ class SettingsManager(ttk.Toplevel):
         self.height_entry = ttk.Entry(size_frame, width=8)
         self.height_entry.pack(side=tk.LEFT, padx=(5, 0))
 
-        apply_size_button = ttk.Button(general_frame, text="Apply Size", command=self.apply_size)
+        apply_size_button = ttk.Button(self.general_frame, text="Apply Size", command=self.apply_size)
         apply_size_button.pack(anchor=tk.W)
 
         # Set current size
@@ -113,8 +139,8 @@ class SettingsManager(ttk.Toplevel):
         self.height_entry.insert(0, height)
 
         # Personalized Greeting Settings
-        ttk.Label(general_frame, text="Status Bar:").pack(anchor=tk.W, pady=(15, 5))
-        greeting_frame = ttk.Frame(general_frame)
+        ttk.Label(self.general_frame, text="Status Bar:").pack(anchor=tk.W, pady=(15, 5))
+        greeting_frame = ttk.Frame(self.general_frame)
         greeting_frame.pack(fill=tk.X, pady=(0, 10))
         
         self.personalized_greeting_var = tk.BooleanVar()
@@ -139,8 +165,8 @@ class SettingsManager(ttk.Toplevel):
         greeting_desc.pack(anchor=tk.W, pady=(2, 0))
 
         # Cache Settings
-        ttk.Label(general_frame, text="Cache Settings:").pack(anchor=tk.W, pady=(15, 5))
-        cache_frame = ttk.Frame(general_frame)
+        ttk.Label(self.general_frame, text="Cache Settings:").pack(anchor=tk.W, pady=(15, 5))
+        cache_frame = ttk.Frame(self.general_frame)
         cache_frame.pack(fill=tk.X, pady=(0, 10))
         
         # Cache size setting
@@ -160,15 +186,11 @@ class SettingsManager(ttk.Toplevel):
         apply_cache_button = ttk.Button(cache_frame, text="Apply Cache Settings", command=self.apply_cache_settings)
         apply_cache_button.pack(anchor=tk.W, pady=(5, 0))
 
-        # Lazy load MemberManager
-        self.member_manager_frame = None
-        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
-
-        self.protocol("WM_DELETE_WINDOW", self.on_closing)
-
     def on_tab_change(self, event):
         selected_tab = self.notebook.tab(self.notebook.select(), "text")
-        if selected_tab == "Members" and self.member_manager_frame is None:
+        if selected_tab == "General":
+            self._populate_general_tab()
+        elif selected_tab == "Members" and self.member_manager_frame is None:
             self.member_manager_frame = MemberManager(self.members_tab, self.parent)
             self.member_manager_frame.pack(expand=True, fill=tk.BOTH)
 
@@ -4,10 +4,11 @@ from PIL import Image, ImageTk
 import logging
 import os
 import requests
-import re
 from urllib.parse import urlparse
 from io import BytesIO
 
+from ...pluralkit_api import TRUSTED_AVATAR_DOMAINS, AVATAR_EXTENSIONS, UNSAFE_FILENAME_CHARS
+
 class MemberList:
     def __init__(self, parent_frame, logger, avatar_cache, thumbnail_cache, selection_callback, system_db, status_bar, app_db=None):
         self.parent_frame = parent_frame
@@ -82,7 +83,7 @@ class MemberList:
                 self.thumbnail_references.append(thumbnail)
                 
                 # Manage cache size to prevent memory issues
-                max_thumb_size = int(self.app_db.get_setting('max_thumbnail_cache_size', '200')) if self.app_db else 200
+                max_thumb_size = self.max_thumbnail_cache_size
                 if len(self.thumbnail_cache) > max_thumb_size and max_thumb_size > 0:  # Only manage size if limit > 0
                     # Remove oldest entries (first ones added)
                     excess = len(self.thumbnail_cache) - max_thumb_size
@@ -166,24 +167,13 @@ class MemberList:
                 return False
 
             # Whitelist trusted domains
-            trusted_domains = [
-                'cdn.pluralkit.me',
-                'media.discordapp.net',
-                'cdn.discordapp.com',
-                'i.imgur.com',
-                'avatars.githubusercontent.com',
-                'localhost',  # For development
-                '127.0.0.1'   # For development
-            ]
-
-            if parsed.hostname not in trusted_domains:
+            if parsed.hostname not in TRUSTED_AVATAR_DOMAINS:
                 self.logger.warning(f"Rejected untrusted domain: {parsed.hostname}")
                 return False
 
             # Check file extension
             path = parsed.path.lower()
-            allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
-            if not any(path.endswith(ext) for ext in allowed_extensions):
+            if not path.endswith(AVATAR_EXTENSIONS):
                 self.logger.warning(f"Rejected invalid file type: {path}")
                 return False
 
@@ -197,7 +187,7 @@ class MemberList:
     def _sanitize_filename(self, member_id: str) -> str:
         """Sanitize filename to prevent path traversal"""
         # Remove any path separators and special characters
-        safe_id = re.sub(r'[^\w\-_]', '_', str(member_id))
+        safe_id = UNSAFE_FILENAME_CHARS.sub('_', str(member_id))
         # Limit length
         safe_id = safe_id[:50]
         # Ensure it's not empty
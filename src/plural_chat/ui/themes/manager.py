@@ -1,12 +1,14 @@
 """
 Clean theme management - no more debug hell!
 """
+import logging
 import ttkbootstrap as ttk
 
 class ThemeManager:
     def __init__(self, root_window):
         self.root = root_window
         self.current_theme = "superhero"  # Safe default
+        self.logger = logging.getLogger('plural_chat.theme_manager')
 
     def get_available_themes(self):
         """Get all working built-in themes (no custom themes for now)"""
@@ -30,10 +32,10 @@ class ThemeManager:
                 # Simple and clean
                 self.root.style.theme_use(theme_name)
                 self.current_theme = theme_name
-                print(f"✅ Applied theme: {theme_name}")
+                self.logger.info(f"Applied theme: {theme_name}")
             return True
         except Exception as e:
-            print(f"❌ Theme failed: {e}")
+            self.logger.error(f"Theme failed: {e}")
             return False
 
     def get_current_theme(self):